@@ -15,6 +15,7 @@ import kotlin.concurrent.timerTask
 import android.content.Intent
 import android.content.ServiceConnection
 import android.os.IBinder
+import android.os.SystemClock
 import android.content.ComponentName
 import android.content.Context
 import android.util.Log
@@ -24,6 +25,8 @@ class MainActivity : AppCompatActivity() {
     private lateinit var udpTransport: UdpTransport
     private lateinit var controllerHandler: ControllerInputHandler
     private var sendTimer: Timer? = null
+    private var sendTask: TimerTask? = null
+    private var sendTaskTime: Long = 0
     private var isConnected = false
     private var controllerDetected = false
     
@@ -64,6 +67,10 @@ class MainActivity : AppCompatActivity() {
 
         udpTransport = UdpTransport()
         controllerHandler = ControllerInputHandler()
+        udpTransport.rateControlListener = { control ->
+            controllerHandler.applyRateControl(control.targetRateHz, control.keepaliveMs)
+            onInputChanged() // A shorter interval may make a packet due sooner
+        }
 
         setupUI()
         checkForController()
@@ -109,6 +116,7 @@ class MainActivity : AppCompatActivity() {
 
         try {
             Log.d(TAG, "Attempting to connect to $ip:$port")
+            controllerHandler.resetRateControl()
             if (udpTransport.connect(ip, port)) {
                 isConnected = true
                 updateUI(true)
@@ -194,18 +202,48 @@ class MainActivity : AppCompatActivity() {
 
     private fun startSendingData() {
         Log.d(TAG, "Starting data sending timer")
-        sendTimer = Timer()
-        sendTimer?.scheduleAtFixedRate(timerTask {
-            if (isConnected && controllerHandler.shouldSendPacket()) {
-                val packet = controllerHandler.getCurrentPacket()
-                Log.d(TAG, "Sending packet: buttons=${packet.buttons}, LX=${packet.leftX}, LY=${packet.leftY}, RX=${packet.rightX}, RY=${packet.rightY}")
-                val result = udpTransport.send(packet.toByteArray())
-                Log.d(TAG, "Send result: $result")
-            }
-        }, 0, 10) // 100 Hz = 10 ms interval
+        synchronized(this) {
+            sendTimer = Timer()
+        }
+        scheduleNextSend(0)
+    }
+
+    // Sends are scheduled for exactly when the handler says the next packet is due,
+    // rather than polled, so the send interval isn't rounded up to a poll period
+    @Synchronized
+    private fun scheduleNextSend(delayMs: Long) {
+        val timer = sendTimer ?: return
+        val runAt = System.currentTimeMillis() + delayMs
+        if (sendTask != null && sendTaskTime <= runAt) return // Already due sooner
+        sendTask?.cancel()
+        sendTask = timerTask { sendPendingPacket() }
+        sendTaskTime = runAt
+        timer.schedule(sendTask, delayMs)
+    }
+
+    private fun sendPendingPacket() {
+        synchronized(this) {
+            sendTask = null
+        }
+        if (isConnected && controllerHandler.shouldSendPacket()) {
+            val packet = controllerHandler.getCurrentPacket()
+            Log.d(TAG, "Sending packet: buttons=${packet.buttons}, LX=${packet.leftX}, LY=${packet.leftY}, RX=${packet.rightX}, RY=${packet.rightY}")
+            val result = udpTransport.send(packet.toByteArray(controllerHandler.nextSequence(), SystemClock.elapsedRealtime()))
+            Log.d(TAG, "Send result: $result")
+        }
+        scheduleNextSend(controllerHandler.millisUntilNextSend())
+    }
+
+    // Input changed, so a packet may be due before the pending keepalive
+    private fun onInputChanged() {
+        if (isConnected) {
+            scheduleNextSend(controllerHandler.millisUntilNextSend())
+        }
     }
 
+    @Synchronized
     private fun stopSendingData() {
+        sendTask = null
         sendTimer?.cancel()
         sendTimer = null
     }
@@ -265,6 +303,7 @@ class MainActivity : AppCompatActivity() {
             // Handle the event in our app and prevent system from processing it
             val handled = controllerHandler.handleKeyEvent(event)
             Log.d(TAG, "KeyEvent handled: $handled")
+            onInputChanged()
             // Return true to indicate we've handled the event
             // This prevents the system from processing it as a navigation command
             // Special handling for HOME button - always consume it to prevent app exit
@@ -285,6 +324,7 @@ class MainActivity : AppCompatActivity() {
             // Handle the event in our app and prevent system from processing it
             val handled = controllerHandler.handleKeyEvent(event)
             Log.d(TAG, "KeyEvent handled: $handled")
+            onInputChanged()
             // Return true to indicate we've handled the event
             // This prevents the system from processing it as a navigation command
             // Special handling for HOME button - always consume it to prevent app exit
@@ -306,6 +346,7 @@ class MainActivity : AppCompatActivity() {
             // Handle the event in our app and prevent system from processing it
             val handled = controllerHandler.handleMotionEvent(event)
             Log.d(TAG, "MotionEvent handled: $handled")
+            onInputChanged()
             // Return true to indicate we've handled the event
             return handled || super.onGenericMotionEvent(event)
         }
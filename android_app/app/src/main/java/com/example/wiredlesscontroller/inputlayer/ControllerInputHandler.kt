@@ -9,7 +9,13 @@ import java.util.*
 class ControllerInputHandler {
     private val inputPacket = InputPacket()
     private var lastSendTime: Long = 0
-    private val sendInterval: Long = 10 // 100 Hz = 10 ms interval
+    private var lastSentPacket: InputPacket? = null
+    private var sequence: Int = 0
+    
+    // Send on change at most every sendInterval, otherwise only every keepaliveInterval.
+    // Both are adjusted by rate control datagrams from the PC server.
+    @Volatile private var sendInterval: Long = DEFAULT_SEND_INTERVAL
+    @Volatile private var keepaliveInterval: Long = DEFAULT_KEEPALIVE_INTERVAL
     private val TAG = "ControllerInputHandler"
     
     // Track hat state for canonical D-pad handling
@@ -54,6 +60,16 @@ class ControllerInputHandler {
         const val BUTTON_R3 = 0x0800
         // Home button mapping - using 0x0040 as specified
         const val BUTTON_HOME = 0x0040
+        
+        // Send rate defaults until the server sends rate control
+        const val DEFAULT_SEND_INTERVAL: Long = 10 // 100 Hz = 10 ms interval
+        const val DEFAULT_KEEPALIVE_INTERVAL: Long = 1000
+        
+        // Bounds for rate control, matching the limits the server uses
+        const val MIN_RATE_HZ = 20
+        const val MAX_RATE_HZ = 100
+        const val MIN_KEEPALIVE_INTERVAL: Long = 250
+        const val MAX_KEEPALIVE_INTERVAL: Long = 1000
 <<<<<<< HEAD
         
         // Trigger threshold for button-based triggers
@@ -396,13 +412,45 @@ class ControllerInputHandler {
     
     fun shouldSendPacket(): Boolean {
         val currentTime = System.currentTimeMillis()
-        if (currentTime - lastSendTime >= sendInterval) {
+        val elapsed = currentTime - lastSendTime
+        val changed = inputPacket != lastSentPacket
+        if ((changed && elapsed >= sendInterval) || elapsed >= keepaliveInterval) {
             lastSendTime = currentTime
+            lastSentPacket = inputPacket.copy()
             return true
         }
         return false
     }
     
+    // Milliseconds until shouldSendPacket() can next return true for the current state
+    fun millisUntilNextSend(): Long {
+        val elapsed = System.currentTimeMillis() - lastSendTime
+        val changed = inputPacket != lastSentPacket
+        val interval = if (changed) sendInterval else keepaliveInterval
+        return Math.max(0L, interval - elapsed)
+    }
+    
+    // Sequence number for the next packet, lets the server detect lost packets
+    fun nextSequence(): Int {
+        sequence = (sequence + 1) and 0xFFFF
+        return sequence
+    }
+    
+    fun applyRateControl(targetRateHz: Int, keepaliveMs: Int) {
+        // Clamp so a bad or spoofed datagram can't stall or flood input
+        sendInterval = 1000L / targetRateHz.coerceIn(MIN_RATE_HZ, MAX_RATE_HZ)
+        keepaliveInterval = keepaliveMs.toLong().coerceIn(MIN_KEEPALIVE_INTERVAL, MAX_KEEPALIVE_INTERVAL)
+        Log.d(TAG, "Rate control applied: send interval ${sendInterval}ms, keepalive ${keepaliveInterval}ms")
+    }
+    
+    // Reset send rate to defaults (for a new connection)
+    fun resetRateControl() {
+        sendInterval = DEFAULT_SEND_INTERVAL
+        keepaliveInterval = DEFAULT_KEEPALIVE_INTERVAL
+        lastSentPacket = null
+        lastSendTime = 0
+    }
+    
     // Reset hat state (for fallback detection)
     fun resetHatState() {
         hatPresent = false
@@ -12,7 +12,8 @@ data class InputPacket(
     var leftTrigger: Byte = 0,
     var rightTrigger: Byte = 0
 ) {
-    fun toByteArray(): ByteArray {
+    // sequence and timestampMs let the PC estimate loss and jitter; both wrap at 16 bits
+    fun toByteArray(sequence: Int = 0, timestampMs: Long = 0): ByteArray {
         val buffer = ByteBuffer.allocate(PACKET_SIZE)
         buffer.order(ByteOrder.LITTLE_ENDIAN)
         
@@ -23,12 +24,13 @@ data class InputPacket(
         buffer.putShort(rightY)
         buffer.put(leftTrigger)
         buffer.put(rightTrigger)
-        buffer.put(ByteArray(4)) // Reserved bytes (4 bytes to make total 16)
+        buffer.putShort(sequence.toShort())
+        buffer.putShort(timestampMs.toInt().toShort())
         
         return buffer.array()
     }
     
     companion object {
-        const val PACKET_SIZE = 16 // 2+2+2+2+2+1+1+4 = 16 bytes
+        const val PACKET_SIZE = 16 // 2+2+2+2+2+1+1+2+2 = 16 bytes
     }
 }
\ No newline at end of file
@@ -0,0 +1,37 @@
+package com.example.wiredlesscontroller.transportlayer
+
+import java.nio.ByteBuffer
+import java.nio.ByteOrder
+
+/**
+ * Send rate instructions from the PC server.
+ * The server estimates link quality from our packets and periodically sends
+ * an 8-byte control datagram back with the rate we should send at while the
+ * input is changing and the keepalive interval to use while it is idle.
+ */
+data class RateControl(
+    val targetRateHz: Int,
+    val keepaliveMs: Int
+) {
+    companion object {
+        const val CONTROL_SIZE = 8 // 2+1+1+2+2 = 8 bytes
+        const val CONTROL_VERSION = 1
+        private const val MAGIC_0 = 'W'.code.toByte()
+        private const val MAGIC_1 = 'L'.code.toByte()
+
+        fun fromByteArray(data: ByteArray, length: Int = data.size): RateControl? {
+            if (length != CONTROL_SIZE) return null
+            val buffer = ByteBuffer.wrap(data, 0, length)
+            buffer.order(ByteOrder.LITTLE_ENDIAN)
+
+            if (buffer.get() != MAGIC_0 || buffer.get() != MAGIC_1) return null
+            if (buffer.get().toInt() and 0xFF != CONTROL_VERSION) return null
+            buffer.get() // Flags, unused
+
+            val targetRateHz = buffer.short.toInt() and 0xFFFF
+            val keepaliveMs = buffer.short.toInt() and 0xFFFF
+            if (targetRateHz == 0 || keepaliveMs == 0) return null
+            return RateControl(targetRateHz, keepaliveMs)
+        }
+    }
+}
@@ -11,9 +11,13 @@ class UdpTransport : Transport {
     private var socket: DatagramSocket? = null
     private var serverAddress: InetAddress? = null
     private var serverPort: Int = 0
-    private var connected = false
+    @Volatile private var connected = false
+    private var receiveThread: Thread? = null
     private val TAG = "UdpTransport"
 
+    // Called from the receive thread when the server sends new rate instructions
+    var rateControlListener: ((RateControl) -> Unit)? = null
+
     override fun connect(ip: String, port: Int): Boolean {
         return try {
             Log.d(TAG, "Attempting to connect to $ip:$port")
@@ -21,6 +25,7 @@ class UdpTransport : Transport {
             serverPort = port
             socket = DatagramSocket()
             connected = true
+            startReceiving()
             Log.d(TAG, "Successfully connected to $ip:$port")
             true
         } catch (e: UnknownHostException) {
@@ -59,8 +64,11 @@ class UdpTransport : Transport {
     override fun disconnect(): Boolean {
         return try {
             Log.d(TAG, "Disconnecting")
+            connected = false
             socket?.close()
             socket = null
+            receiveThread?.join(1000)
+            receiveThread = null
             serverAddress = null
             connected = false
             Log.d(TAG, "Disconnected")
@@ -71,6 +79,40 @@ class UdpTransport : Transport {
         }
     }
 
+    private fun startReceiving() {
+        val receiveSocket = socket ?: return
+        receiveThread = Thread {
+            val buffer = ByteArray(64) // Larger than any control datagram so oversized ones are rejected
+            while (connected && !receiveSocket.isClosed) {
+                try {
+                    val packet = DatagramPacket(buffer, buffer.size)
+                    receiveSocket.receive(packet)
+                    if (packet.address != serverAddress || packet.port != serverPort) {
+                        Log.w(TAG, "Ignoring datagram from unexpected sender ${packet.address}:${packet.port}")
+                        continue
+                    }
+                    val control = RateControl.fromByteArray(packet.data, packet.length)
+                    if (control != null) {
+                        Log.d(TAG, "Rate control received: ${control.targetRateHz} Hz, keepalive ${control.keepaliveMs} ms")
+                        rateControlListener?.invoke(control)
+                    } else {
+                        Log.w(TAG, "Ignoring unexpected datagram of size ${packet.length}")
+                    }
+                } catch (e: SocketException) {
+                    // Socket closed by disconnect()
+                    break
+                } catch (e: Exception) {
+                    Log.e(TAG, "Failed to receive data: ${e.message}", e)
+                }
+            }
+            Log.d(TAG, "Receive thread stopped")
+        }.apply {
+            isDaemon = true
+            name = "UdpTransportReceive"
+            start()
+        }
+    }
+
     override fun isConnected(): Boolean {
         val isSocketOpen = socket?.isClosed == false
         Log.d(TAG, "isConnected check: connected=$connected, socketOpen=$isSocketOpen")
@@ -0,0 +1,184 @@
+import struct
+import time
+
+# Control datagram sent from the server back to a client:
+# char magic[2] = b'WL', uint8 version, uint8 flags, uint16 target_rate_hz, uint16 keepalive_ms
+# Format: <2sBBHH (2+1+1+2+2 = 8 bytes)
+CONTROL_FORMAT = '<2sBBHH'
+CONTROL_SIZE = struct.calcsize(CONTROL_FORMAT)
+CONTROL_MAGIC = b'WL'
+CONTROL_VERSION = 1
+
+# Rate limits (the client used to send at a fixed 100 Hz)
+MAX_RATE_HZ = 100
+MIN_RATE_HZ = 20
+RATE_STEP_HZ = 10         # Additive increase per clean control window
+RATE_BACKOFF = 0.7        # Multiplicative decrease per congested window
+
+# Keepalive interval used by the client while the input state is idle
+KEEPALIVE_MAX_MS = 1000
+KEEPALIVE_MIN_MS = 250
+
+# Link quality thresholds
+LOSS_LOW = 0.01
+LOSS_HIGH = 0.05
+JITTER_LOW_MS = 8.0
+JITTER_HIGH_MS = 20.0
+LOSS_SMOOTHING = 1 / 32   # Weight of each expected packet in the loss average
+MIN_WINDOW_SAMPLES = 5    # Windows with fewer packets never trigger a backoff
+MAX_TRACKED_GAP = 64      # Longer gaps are counted as lost but not tracked for late arrivals
+
+CONTROL_INTERVAL = 1.0    # Seconds between control datagrams per client
+CLIENT_TIMEOUT = 10.0     # Forget clients silent for this long
+
+
+def pack_control(target_rate_hz, keepalive_ms):
+    """Build a control datagram for a client"""
+    return struct.pack(CONTROL_FORMAT, CONTROL_MAGIC, CONTROL_VERSION, 0,
+                       int(target_rate_hz), int(keepalive_ms))
+
+
+def unpack_control(data):
+    """Parse a control datagram, returning (target_rate_hz, keepalive_ms) or None"""
+    if len(data) != CONTROL_SIZE:
+        return None
+    magic, version, _flags, target_rate_hz, keepalive_ms = struct.unpack(CONTROL_FORMAT, data)
+    if magic != CONTROL_MAGIC or version != CONTROL_VERSION:
+        return None
+    return target_rate_hz, keepalive_ms
+
+
+class LinkEstimator:
+    """Tracks link quality and the send rate target for a single client.
+
+    Loss comes from gaps in the 16-bit packet sequence number and jitter from
+    the RFC 3550 interarrival estimate using the client's 16-bit millisecond
+    timestamp, so irregular send-on-change traffic does not count as jitter.
+    """
+
+    def __init__(self):
+        self.sequenced = False    # False for clients that leave the reserved bytes zeroed
+        self.last_seq = None
+        self.last_sender_ms = None
+        self.last_arrival = None
+        self.jitter_ms = 0.0
+        self.loss = 0.0
+        self.window_received = 0
+        self.window_lost = 0
+        self.window_missing = set()  # Sequence numbers counted as lost this window
+        self.window_jitter_sum = 0.0
+        self.window_jitter_samples = 0
+        self.target_rate_hz = MAX_RATE_HZ
+        self.keepalive_ms = KEEPALIVE_MAX_MS
+        self.last_control = None
+
+    def on_packet(self, seq, sender_ms, now):
+        if seq or sender_ms:
+            self.sequenced = True
+
+        if self.sequenced and self.last_seq is not None:
+            delta = (seq - self.last_seq) & 0xFFFF
+            if delta == 0:
+                # Duplicate
+                return
+            if delta > 0x8000:
+                # Late packet: only credit it if it fills a gap, otherwise it's a stale duplicate
+                if seq in self.window_missing:
+                    self.window_missing.remove(seq)
+                    self.window_lost -= 1
+                    self.window_received += 1
+                return
+            self.window_lost += delta - 1
+            if delta - 1 <= MAX_TRACKED_GAP:
+                self.window_missing.update((self.last_seq + i) & 0xFFFF for i in range(1, delta))
+
+            sender_delta = (sender_ms - self.last_sender_ms) & 0xFFFF
+            arrival_delta = (now - self.last_arrival) * 1000.0
+            # Skip jitter samples across gaps long enough to wrap the timestamp
+            if arrival_delta < 0x8000:
+                d = abs(arrival_delta - sender_delta)
+                self.jitter_ms += (d - self.jitter_ms) / 16.0
+                self.window_jitter_sum += d
+                self.window_jitter_samples += 1
+
+        self.window_received += 1
+        self.last_seq = seq
+        self.last_sender_ms = sender_ms
+        self.last_arrival = now
+
+    def update(self):
+        """Close the current window and adjust the rate targets"""
+        expected = self.window_received + self.window_lost
+        if expected == 0:
+            return
+        window_loss = self.window_lost / expected
+        # Same as a per-packet EWMA, so a window holding a single keepalive barely moves it
+        weight = 1.0 - (1.0 - LOSS_SMOOTHING) ** expected
+        self.loss += (window_loss - self.loss) * weight
+
+        # Back off only on evidence from this window, not on a slowly decaying average
+        lossy = expected >= MIN_WINDOW_SAMPLES and window_loss > LOSS_HIGH
+        jittery = self.window_jitter_samples >= MIN_WINDOW_SAMPLES and \
+            self.window_jitter_sum / self.window_jitter_samples > JITTER_HIGH_MS
+        self.window_received = 0
+        self.window_lost = 0
+        self.window_missing.clear()
+        self.window_jitter_sum = 0.0
+        self.window_jitter_samples = 0
+
+        if lossy or jittery:
+            self.target_rate_hz = max(MIN_RATE_HZ, int(self.target_rate_hz * RATE_BACKOFF))
+        elif self.loss < LOSS_LOW and self.jitter_ms < JITTER_LOW_MS:
+            self.target_rate_hz = min(MAX_RATE_HZ, self.target_rate_hz + RATE_STEP_HZ)
+
+        # Lossy links get shorter keepalives so a dropped state change is repaired sooner
+        scale = min(1.0, self.loss / LOSS_HIGH)
+        self.keepalive_ms = int(KEEPALIVE_MAX_MS - (KEEPALIVE_MAX_MS - KEEPALIVE_MIN_MS) * scale)
+
+
+class LinkController:
+    """Per-client link estimation and the periodic control loop.
+
+    Has no Qt dependency so it can be driven from a plain socket loop.
+    """
+
+    def __init__(self, control_interval=CONTROL_INTERVAL, client_timeout=CLIENT_TIMEOUT):
+        self.control_interval = control_interval
+        self.client_timeout = client_timeout
+        self.clients = {}
+
+    def observe(self, addr, seq, sender_ms, now=None):
+        if now is None:
+            now = time.monotonic()
+        estimator = self.clients.get(addr)
+        if estimator is None:
+            estimator = LinkEstimator()
+            estimator.last_control = now
+            self.clients[addr] = estimator
+        estimator.on_packet(seq, sender_ms, now)
+
+    def send_due(self, sock, now=None):
+        """Send control datagrams to clients whose interval elapsed, returns the number sent"""
+        if now is None:
+            now = time.monotonic()
+        sent = 0
+        for addr, estimator in list(self.clients.items()):
+            if now - estimator.last_arrival > self.client_timeout:
+                del self.clients[addr]
+                continue
+            if now - estimator.last_control < self.control_interval:
+                continue
+            estimator.last_control = now
+            estimator.update()
+            # Clients that don't sequence their packets don't listen for control either
+            if not estimator.sequenced:
+                continue
+            try:
+                sock.sendto(pack_control(estimator.target_rate_hz, estimator.keepalive_ms), addr)
+                sent += 1
+            except OSError as e:
+                print(f"Failed to send control datagram to {addr}: {e}")
+        return sent
+
+    def clear(self):
+        self.clients.clear()
@@ -0,0 +1,318 @@
+# link_sim.py
+# Usage: python link_sim.py [loss] [jitter_ms] [seconds] [seed]
+#        python link_sim.py check
+# Runs the receiver's link estimator and control loop against a simulated
+# client on loopback, without Qt or vgamepad. The client sends on change and on
+# keepalive, at the rate the control datagrams ask for, through a link that
+# drops `loss` of its packets and delays each by up to `jitter_ms`.
+# Examples:
+#   python link_sim.py 0 0        # clean link: rate should stay at the maximum
+#   python link_sim.py 0.2 40     # weak link: rate and keepalive should drop
+# `check` runs deterministic estimator checks with explicit timestamps, then
+# seeded loopback runs on a clean and a lossy link, and exits non-zero on failure.
+
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+
+from link_control import (
+    LinkController, LinkEstimator, unpack_control,
+    MAX_RATE_HZ, MIN_RATE_HZ, KEEPALIVE_MAX_MS
+)
+
+PACKET_FORMAT = '<HhhhhBBHH'
+
+
+class SimulatedClient:
+    def __init__(self, server_addr, loss, jitter_ms, seed=None):
+        self.server_addr = server_addr
+        self.random = random.Random(seed)
+        self.loss = loss
+        self.jitter_ms = jitter_ms
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.settimeout(0.05)
+        self.running = False
+        self.target_rate_hz = MAX_RATE_HZ
+        self.keepalive_ms = KEEPALIVE_MAX_MS
+        self.sequence = 0
+        self.sent = 0
+        self.start_time = time.monotonic()
+
+    def run(self, seconds):
+        self.running = True
+        receiver = threading.Thread(target=self.receive_controls, daemon=True)
+        receiver.start()
+
+        last_state = None
+        last_send = 0.0
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            now = time.monotonic()
+            # Stick moves for half of every two seconds, then the input is idle
+            elapsed = now - self.start_time
+            moving = int(elapsed) % 2 == 0
+            state = int(now * 1000) % 32767 if moving else 0
+
+            # Same whole-millisecond intervals as ControllerInputHandler
+            send_interval = (1000 // self.target_rate_hz) / 1000.0
+            keepalive = self.keepalive_ms / 1000.0
+            changed = state != last_state
+            due = last_send + (send_interval if changed else keepalive)
+            if now >= due:
+                self.send(state, now)
+                last_state = state
+                last_send = now
+                continue
+
+            # Like the app, sleep until a packet is due or the input next changes
+            if moving:
+                next_change = (int(now * 1000) + 1) / 1000.0
+            else:
+                next_change = self.start_time + int(elapsed) + 1
+            time.sleep(min(due, next_change, end) - now)
+
+        self.running = False
+        receiver.join(timeout=1.0)
+        self.socket.close()
+
+    def send(self, state, now):
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        self.sent += 1
+        timestamp_ms = int((now - self.start_time) * 1000) & 0xFFFF
+        data = struct.pack(PACKET_FORMAT, 0, state, 0, 0, 0, 0, 0, self.sequence, timestamp_ms)
+        if self.random.random() < self.loss:
+            return
+        delay = self.random.uniform(0, self.jitter_ms) / 1000.0
+        threading.Timer(delay, self.socket.sendto, (data, self.server_addr)).start()
+
+    def receive_controls(self):
+        while self.running:
+            try:
+                data, _ = self.socket.recvfrom(64)
+            except (socket.timeout, OSError):
+                continue
+            control = unpack_control(data)
+            if control:
+                self.target_rate_hz, self.keepalive_ms = control
+
+
+def serve(sock, controller, stop):
+    while not stop.is_set():
+        controller.send_due(sock)
+        try:
+            data, addr = sock.recvfrom(16)
+        except socket.timeout:
+            continue
+        if len(data) == 16:
+            unpacked = struct.unpack(PACKET_FORMAT, data)
+            controller.observe(addr, unpacked[7], unpacked[8])
+
+
+def simulate(loss, jitter_ms, seconds, seed=None):
+    """Run a simulated client against the control loop, returns (client, controller)"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(0.05)
+    controller = LinkController(control_interval=0.5)
+    stop = threading.Event()
+    server_thread = threading.Thread(target=serve, args=(server, controller, stop), daemon=True)
+    server_thread.start()
+
+    client = SimulatedClient(server.getsockname(), loss, jitter_ms, seed)
+    client.run(seconds)
+
+    stop.set()
+    server_thread.join(timeout=1.0)
+    server.close()
+    return client, controller
+
+
+class RecordingSocket:
+    """Stands in for the server socket and keeps every control datagram sent"""
+
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((addr, data))
+
+
+def feed(estimator, seqs, start=0.0, interval=0.01):
+    """Deliver packets with the given sequence numbers at a steady interval"""
+    now = start
+    for seq in seqs:
+        now += interval
+        estimator.on_packet(seq, int(now * 1000) & 0xFFFF, now)
+    return now
+
+
+def run_window(controller, addr, now, seq, packets=100, lose_every=0, jitter_ms=0.0):
+    """Send one second of packets through the controller, then tick the control loop.
+
+    Returns the time and last sequence number sent, lost or not, and the estimator.
+    """
+    interval = 1.0 / packets
+    for i in range(packets):
+        seq = (seq + 1) & 0xFFFF
+        sender_time = now + (i + 1) * interval
+        if lose_every and seq % lose_every == 0:
+            continue
+        # Alternate late and on-time arrivals to produce jitter
+        arrival = sender_time + (jitter_ms / 1000.0 if i % 2 else 0.0)
+        controller.observe(addr, seq, int(sender_time * 1000) & 0xFFFF, arrival)
+    now += 1.0
+    controller.send_due(RecordingSocket(), now + 0.1)
+    return now, seq, controller.clients[addr]
+
+
+def check_sequence_wrap():
+    estimator = LinkEstimator()
+    feed(estimator, [65534, 65535, 0, 1])
+    assert estimator.window_lost == 0 and estimator.window_received == 4
+    estimator = LinkEstimator()
+    feed(estimator, [65534, 65535, 1])
+    assert estimator.window_lost == 1 and estimator.window_received == 3
+
+
+def check_reorder():
+    estimator = LinkEstimator()
+    feed(estimator, [1, 2, 4, 3, 5])
+    assert estimator.window_lost == 0 and estimator.window_received == 5
+    assert estimator.last_seq == 5
+
+
+def check_duplicates():
+    estimator = LinkEstimator()
+    feed(estimator, [1, 2, 2, 3, 3])
+    assert estimator.window_lost == 0 and estimator.window_received == 3
+
+
+def check_stale_duplicate():
+    # A duplicate of an old packet must not fill the gap left by a lost one
+    estimator = LinkEstimator()
+    feed(estimator, [1, 2, 3, 5, 6, 2])
+    assert estimator.window_lost == 1 and estimator.window_received == 5
+    estimator = LinkEstimator()
+    feed(estimator, [1, 2, 4, 3, 3])
+    assert estimator.window_lost == 0 and estimator.window_received == 4
+
+
+def check_legacy_client():
+    controller = LinkController(control_interval=1.0)
+    sock = RecordingSocket()
+    legacy, sequenced = ('10.0.0.2', 5000), ('10.0.0.3', 5000)
+    for i in range(10):
+        controller.observe(legacy, 0, 0, i * 0.01)
+        controller.observe(sequenced, i + 1, i * 10, i * 0.01)
+    assert controller.send_due(sock, 1.5) == 1
+    assert [addr for addr, _ in sock.sent] == [sequenced]
+
+
+def check_backoff_and_recovery():
+    controller = LinkController(control_interval=1.0)
+    addr = ('10.0.0.2', 5000)
+    now, seq = 0.0, 0
+    for _ in range(3):
+        now, seq, estimator = run_window(controller, addr, now, seq, lose_every=5)
+    assert estimator.target_rate_hz < MAX_RATE_HZ
+    assert estimator.keepalive_ms < KEEPALIVE_MAX_MS
+    for _ in range(10):
+        now, seq, estimator = run_window(controller, addr, now, seq)
+    assert estimator.target_rate_hz == MAX_RATE_HZ
+    assert estimator.keepalive_ms >= KEEPALIVE_MAX_MS - 1
+
+
+def check_jitter_backoff():
+    controller = LinkController(control_interval=1.0)
+    addr = ('10.0.0.2', 5000)
+    now, seq, estimator = run_window(controller, addr, 0.0, 0, jitter_ms=50.0)
+    now, seq, estimator = run_window(controller, addr, now, seq, jitter_ms=50.0)
+    assert estimator.target_rate_hz < MAX_RATE_HZ
+
+
+def check_idle_keepalive_drop():
+    # One keepalive per window with a single drop must not throttle the client
+    controller = LinkController(control_interval=1.0)
+    addr = ('10.0.0.2', 5000)
+    now, seq = 0.0, 0
+    for window in range(10):
+        now, seq, estimator = run_window(controller, addr, now, seq, packets=1,
+                                         lose_every=4 if window == 3 else 0)
+        assert estimator.target_rate_hz == MAX_RATE_HZ
+
+
+def check_client_send_rate():
+    # Intermediate targets must not be rounded to a coarser poll period
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    for target in (70, 40):
+        client = SimulatedClient(sink.getsockname(), 0.0, 0.0)
+        client.target_rate_hz = target
+        client.run(1.0)  # The stick moves for the whole first second
+        expected = 1000 / (1000 // target)
+        assert abs(client.sent - expected) <= expected * 0.1, (target, client.sent)
+    sink.close()
+
+
+def check_clean_link():
+    client, _ = simulate(0.0, 0.0, 4.0, seed=1)
+    assert client.target_rate_hz == MAX_RATE_HZ, client.target_rate_hz
+
+
+def check_lossy_link():
+    client, _ = simulate(0.2, 40.0, 5.0, seed=1)
+    assert client.target_rate_hz <= MIN_RATE_HZ * 2, client.target_rate_hz
+    assert client.keepalive_ms < KEEPALIVE_MAX_MS, client.keepalive_ms
+
+
+CHECKS = [
+    check_sequence_wrap,
+    check_reorder,
+    check_duplicates,
+    check_stale_duplicate,
+    check_legacy_client,
+    check_backoff_and_recovery,
+    check_jitter_backoff,
+    check_idle_keepalive_drop,
+    check_client_send_rate,
+    check_clean_link,
+    check_lossy_link,
+]
+
+
+def run_checks():
+    failed = 0
+    for check in CHECKS:
+        try:
+            check()
+            print(f"PASS {check.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {check.__name__} {e}")
+    print(f"{len(CHECKS) - failed}/{len(CHECKS)} checks passed")
+    return failed == 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "check":
+        sys.exit(0 if run_checks() else 1)
+
+    loss = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    jitter_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 40.0
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 8.0
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    print(f"Simulating loss={loss:.0%} jitter<={jitter_ms:.0f}ms for {seconds:.0f}s")
+    client, controller = simulate(loss, jitter_ms, seconds, seed)
+
+    for addr, estimator in controller.clients.items():
+        print(f"Client {addr[0]}:{addr[1]}: loss={estimator.loss:.1%} jitter={estimator.jitter_ms:.1f}ms")
+    print(f"Packets sent: {client.sent} ({client.sent / seconds:.0f}/s)")
+    print(f"Final target: {client.target_rate_hz} Hz, keepalive {client.keepalive_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
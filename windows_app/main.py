@@ -8,6 +8,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QObject
 
+from link_control import LinkController
+
 # Replace vigemclient with vgamepad
 try:
     import vgamepad
@@ -66,11 +68,19 @@ class UdpReceiver(QObject):
         self._thread = None  # Use _thread to avoid conflict with QObject.thread
         self.client_address = None  # Initialize client_address attribute
         self.test_mode = False  # Test mode flag
+        self.link_controller = LinkController()  # Per-client send rate control
         
     def start(self):
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.socket.bind(('', self.port))
+            # On Windows a control datagram to a phone that has gone away makes the next
+            # recvfrom fail with WinError 10054 unless this is turned off
+            if hasattr(socket, 'SIO_UDP_CONNRESET'):
+                self.socket.ioctl(socket.SIO_UDP_CONNRESET, False)
+            # Wake up periodically so control datagrams go out while clients are idle
+            self.socket.settimeout(0.1)
+            self.link_controller.clear()
             self.running = True
             
             # Start listening in a separate thread
@@ -83,6 +93,7 @@ class UdpReceiver(QObject):
     
     def stop(self):
         self.running = False
+        self.link_controller.clear()  # Nothing left to send control datagrams to
         if self.socket:
             self.socket.close()
         if self._thread and self._thread.is_alive():
@@ -96,7 +107,12 @@ class UdpReceiver(QObject):
             try:
                 if self.socket is None:
                     continue
-                data, addr = self.socket.recvfrom(16)  # Expecting 16-byte packets
+                if self.running:
+                    self.link_controller.send_due(self.socket)
+                try:
+                    data, addr = self.socket.recvfrom(16)  # Expecting 16-byte packets
+                except (socket.timeout, ConnectionResetError):
+                    continue
                 print(f"Received packet of size {len(data)} bytes from {addr}")
                 if len(data) == 16:
                     # Parse the packet
@@ -104,9 +120,10 @@ class UdpReceiver(QObject):
                     
                     # Unpack the data according to our protocol
                     # uint16 buttons, int16 left_x, int16 left_y, int16 right_x, int16 right_y,
-                    # uint8 left_trigger, uint8 right_trigger, uint8 reserved[4]
-                    # Format: <HhhhhBB4s (2+2+2+2+2+1+1+4 = 16 bytes)
-                    unpacked = struct.unpack('<HhhhhBB4s', data)
+                    # uint8 left_trigger, uint8 right_trigger, uint16 sequence, uint16 timestamp_ms
+                    # Format: <HhhhhBBHH (2+2+2+2+2+1+1+2+2 = 16 bytes)
+                    # Older clients leave sequence/timestamp zeroed (formerly reserved bytes)
+                    unpacked = struct.unpack('<HhhhhBBHH', data)
                     
                     input_data.buttons = unpacked[0]
                     input_data.left_x = unpacked[1]
@@ -116,6 +133,8 @@ class UdpReceiver(QObject):
                     input_data.left_trigger = unpacked[5]
                     input_data.right_trigger = unpacked[6]
                     
+                    self.link_controller.observe(addr, unpacked[7], unpacked[8])
+                    
                     # Diagnostic logging
                     print(f"Parsed packet: buttons={input_data.buttons:04x}, LX={input_data.left_x}, LY={input_data.left_y}, RX={input_data.right_x}, RY={input_data.right_y}, LT={input_data.left_trigger}, RT={input_data.right_trigger}")
                     